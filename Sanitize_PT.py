@@ -1,6 +1,6 @@
 import pandas as pd
 import os
-from datetime import datetime
+import time
 
 # === CONFIGURATION ===
 CONFIG = {
@@ -9,21 +9,18 @@ CONFIG = {
     "new_columns": ["Scan Date", "Reviewer", "Remarks"]  # New columns to add at the beginning
 }
 
-def format_duration(duration):
-    seconds = duration.total_seconds()
-    if seconds < 60:
-        return f"{seconds:.2f} seconds"
-    elif seconds < 3600:
-        return f"{seconds // 60:.0f} minutes {seconds % 60:.0f} seconds"
-    else:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
-        return f"{hours} hours {minutes} minutes {seconds} seconds"
+def format_duration(seconds):
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h {m}m {s}s"
+    if m:
+        return f"{m}m {s}s"
+    return f"{seconds:.2f}s"
 
 def main():
     print("\n🚀 Starting the Excel column processing script...")
-    start_time = datetime.now()
+    start_time = time.perf_counter()
 
     # Step 1: Check if input file exists
     print(f"🔍 Checking for file: '{CONFIG['input_excel']}' in current directory...")
@@ -37,23 +34,21 @@ def main():
     df_original = pd.read_excel(CONFIG["input_excel"], engine='openpyxl')
     print(f"✅ Successfully read the file. Original columns are: {list(df_original.columns)}")
 
-    # Step 3: Prepare new empty columns DataFrame
+    # Step 3: Insert new empty columns at the beginning, in place
     print(f"➕ Adding new columns at the beginning: {CONFIG['new_columns']}")
-    df_new = pd.DataFrame(columns=CONFIG["new_columns"])
+    # allow_duplicates: a same-named input column is kept alongside the new one, as concat did
+    for i, col in enumerate(CONFIG["new_columns"]):
+        df_original.insert(i, col, None, allow_duplicates=True)
+    print("🧩 Inserted new columns ahead of original data.")
 
-    # Step 4: Combine new empty columns with original data
-    df_combined = pd.concat([df_new, df_original], axis=1)
-    print("🧩 Combined new columns with original data.")
-
-    # Step 5: Write to output file
+    # Step 4: Write to output file
     print(f"💾 Writing to output file: '{CONFIG['output_excel']}'...")
-    df_combined.to_excel(CONFIG["output_excel"], index=False)
+    df_original.to_excel(CONFIG["output_excel"], index=False)
     print("✅ File saved successfully!")
 
-    # Step 6: Timer Summary
-    end_time = datetime.now()
-    duration = end_time - start_time
-    print(f"🕒 Execution Time: {format_duration(duration)}\n")
+    # Step 5: Timer Summary
+    elapsed = time.perf_counter() - start_time
+    print(f"🕒 Execution Time: {format_duration(elapsed)}\n")
     print("🎉 Script execution completed.\n")
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import pandas as pd
 import os
-from datetime import datetime
+import sys
+import time
 
 # === CONFIGURATION ===
 CONFIG = {
@@ -11,57 +12,59 @@ CONFIG = {
         "Scan Date": "2025-05-24",
         "Reviewer": "Security Team"
         # "Remarks" will be left blank
-    }
+    },
+    "verbose": True                                      # Print progress messages
 }
 
-def format_duration(duration):
-    seconds = duration.total_seconds()
-    if seconds < 60:
-        return f"{seconds:.2f} seconds"
-    elif seconds < 3600:
-        return f"{seconds // 60:.0f} minutes {seconds % 60:.0f} seconds"
-    else:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
-        return f"{hours} hours {minutes} minutes {seconds} seconds"
+# Progress output; silenced when CONFIG["verbose"] is False
+def log(message):
+    if CONFIG["verbose"]:
+        sys.stdout.write(f"{message}\n")
+
+def format_duration(seconds):
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h {m}m {s}s"
+    if m:
+        return f"{m}m {s}s"
+    return f"{seconds:.2f}s"
 
 def main():
-    print("\n🚀 Starting the Excel column processing script...")
-    start_time = datetime.now()
+    log("\n🚀 Starting the Excel column processing script...")
+    start_time = time.perf_counter()
 
-    print(f"🔍 Checking for file: '{CONFIG['input_excel']}' in current directory...")
+    log(f"🔍 Checking for file: '{CONFIG['input_excel']}' in current directory...")
     if not os.path.exists(CONFIG["input_excel"]):
         print(f"❌ File '{CONFIG['input_excel']}' not found. Please check the file name.")
         return
-    print("✅ File found!")
+    log("✅ File found!")
 
-    print("📖 Reading the Excel file...")
+    log("📖 Reading the Excel file...")
     df_original = pd.read_excel(CONFIG["input_excel"], engine='openpyxl')
-    print(f"✅ Successfully read the file. Original columns: {list(df_original.columns)}")
-
-    print(f"➕ Adding new columns: {CONFIG['new_columns']}")
-    df_new = pd.DataFrame()
+    log(f"✅ Successfully read the file. Original columns: {list(df_original.columns)}")
 
-    for col in CONFIG["new_columns"]:
+    log(f"➕ Adding new columns: {CONFIG['new_columns']}")
+    column_notes = []
+    for i, col in enumerate(CONFIG["new_columns"]):
         if col in CONFIG.get("column_static_values", {}):
             static_value = CONFIG["column_static_values"][col]
-            df_new[col] = [static_value] * len(df_original)
-            print(f"🧷 Assigned static value '{static_value}' to column '{col}'")
+            df_original.insert(i, col, static_value, allow_duplicates=True)
+            column_notes.append(f"🧷 Assigned static value '{static_value}' to column '{col}'")
         else:
-            df_new[col] = ["" for _ in range(len(df_original))]
-            print(f"⬜ Column '{col}' will be left empty")
+            df_original.insert(i, col, "", allow_duplicates=True)
+            column_notes.append(f"⬜ Column '{col}' will be left empty")
+    log("\n".join(column_notes))
 
-    df_combined = pd.concat([df_new, df_original], axis=1)
-    print("🧩 Combined new columns with original data.")
+    log("🧩 Inserted new columns ahead of original data.")
 
-    print(f"💾 Writing to output file: '{CONFIG['output_excel']}'...")
-    df_combined.to_excel(CONFIG["output_excel"], index=False)
-    print("✅ File saved successfully!")
+    log(f"💾 Writing to output file: '{CONFIG['output_excel']}'...")
+    df_original.to_excel(CONFIG["output_excel"], index=False)
+    log("✅ File saved successfully!")
 
-    end_time = datetime.now()
-    print(f"🕒 Execution Time: {format_duration(end_time - start_time)}")
-    print("🎉 Script execution completed.\n")
+    log(f"🕒 Execution Time: {format_duration(time.perf_counter() - start_time)}")
+    log("🎉 Script execution completed.\n")
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
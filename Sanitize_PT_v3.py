@@ -1,6 +1,7 @@
 import pandas as pd
-import os
-from datetime import datetime
+import sys
+import time
+from pathlib import Path
 
 # === CONFIGURATION SECTION ===
 CONFIG = {
@@ -10,6 +11,9 @@ CONFIG = {
     # Output file for final results
     "output_file": "updated_main.xlsx",
 
+    # Engine used to read Excel files ("calamine" needs python-calamine; "openpyxl" as fallback)
+    "excel_engine": "calamine",
+
     # New columns to add at the beginning
     "new_columns": ["Scan Date", "Reviewer", "Remarks"],
 
@@ -29,100 +33,104 @@ CONFIG = {
     "lookup_value_column": "App Owner",            # Column to fetch value from in lookup
 
     "unmatched_output_file": "unmatched_rows.xlsx",  # File to write unmatched rows
-    "unmatched_placeholder": "ID not found"        # Value to fill for unmatched rows
+    "unmatched_placeholder": "ID not found",       # Value to fill for unmatched rows
+
+    # Print progress messages
+    "verbose": True
 }
 
+# Progress output; silenced when CONFIG["verbose"] is False
+def log(message):
+    if CONFIG["verbose"]:
+        sys.stdout.write(f"{message}\n")
+
 # Helper to nicely format duration
-def format_duration(duration):
-    seconds = duration.total_seconds()
-    if seconds < 60:
-        return f"{seconds:.2f} seconds"
-    elif seconds < 3600:
-        return f"{seconds // 60:.0f} minutes {seconds % 60:.0f} seconds"
-    else:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
-        return f"{hours} hours {minutes} minutes {seconds} seconds"
+def format_duration(seconds):
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h {m}m {s}s"
+    if m:
+        return f"{m}m {s}s"
+    return f"{seconds:.2f}s"
 
 def main():
-    start_time = datetime.now()
-    print("\n🚀 Starting Excel processing...")
+    start_time = time.perf_counter()
+    log("\n🚀 Starting Excel processing...")
 
     # Step 1: Check that both required files exist
-    for file in [CONFIG["main_file"], CONFIG["lookup_file"]]:
-        if not os.path.exists(file):
+    main_file, lookup_file = Path(CONFIG["main_file"]), Path(CONFIG["lookup_file"])
+    missing = [file for file in (main_file, lookup_file) if not file.is_file()]
+    if missing:
+        for file in missing:
             print(f"❌ File not found: {file}")
-            return
-    print("✅ All required files found.")
+        return
+    log("✅ All required files found.")
 
     # Step 2: Load the main Excel file
-    print(f"📖 Reading main file: {CONFIG['main_file']}")
-    df_main = pd.read_excel(CONFIG["main_file"], engine="openpyxl")
+    log(f"📖 Reading main file: {CONFIG['main_file']}")
+    df_main = pd.read_excel(main_file, engine=CONFIG["excel_engine"])
 
     # Step 3: Add new columns with static values (if configured)
-    print(f"➕ Adding new columns at the beginning: {CONFIG['new_columns']}")
-    df_new = pd.DataFrame()
-    for col in CONFIG["new_columns"]:
+    log(f"➕ Adding new columns at the beginning: {CONFIG['new_columns']}")
+    # Columns are inserted in place at the front, so the existing data is not copied
+    column_notes = []
+    for i, col in enumerate(CONFIG["new_columns"]):
         if col in CONFIG["column_static_values"]:
             val = CONFIG["column_static_values"][col]
-            df_new[col] = [val] * len(df_main)
-            print(f"🧷 Column '{col}' filled with static value: '{val}'")
+            df_main.insert(i, col, val, allow_duplicates=True)
+            column_notes.append(f"🧷 Column '{col}' filled with static value: '{val}'")
         else:
-            df_new[col] = [""] * len(df_main)
-            print(f"⬜ Column '{col}' left blank")
-
-    # Concatenate new columns to the front of the main data
-    df_main = pd.concat([df_new, df_main], axis=1)
-
-    # Step 4: Ensure the target column to fill exists
-    if CONFIG["main_column_to_fill"] not in df_main.columns:
-        print(f"🆕 Column '{CONFIG['main_column_to_fill']}' not found. Creating it.")
-        df_main[CONFIG["main_column_to_fill"]] = ""
-
-    # Step 5: Load the lookup file from specified sheet
-    print(f"📖 Reading lookup file: {CONFIG['lookup_file']} (Sheet: {CONFIG['lookup_sheet_name']})")
-    df_lookup = pd.read_excel(CONFIG["lookup_file"], sheet_name=CONFIG["lookup_sheet_name"], engine="openpyxl")
-
-    # Step 6: Create a lookup dictionary for fast matching
-    print("🔧 Creating lookup dictionary...")
-    lookup_dict = pd.Series(
-        df_lookup[CONFIG["lookup_value_column"]].values,
-        index=df_lookup[CONFIG["lookup_key_column"]]
-    ).to_dict()
-
-    # Step 7: Fill values using the lookup dictionary
-    print(f"🧩 Matching '{CONFIG['main_column_to_match']}' and filling '{CONFIG['main_column_to_fill']}'...")
-    unmatched_rows = []
-    matched_rows = 0
-
-    for idx, value in df_main[CONFIG["main_column_to_match"]].items():
-        if value in lookup_dict:
-            df_main.at[idx, CONFIG["main_column_to_fill"]] = lookup_dict[value]
-            matched_rows += 1
-        else:
-            df_main.at[idx, CONFIG["main_column_to_fill"]] = CONFIG["unmatched_placeholder"]
-            unmatched_rows.append(idx)
-
-    print(f"✅ Filled {matched_rows} rows from lookup.")
-    print(f"⚠️ {len(unmatched_rows)} unmatched rows set to '{CONFIG['unmatched_placeholder']}'")
-
-    # Step 8: Save unmatched rows to a separate Excel file
+            df_main.insert(i, col, "", allow_duplicates=True)
+            column_notes.append(f"⬜ Column '{col}' left blank")
+    log("\n".join(column_notes))
+
+    # Step 4: Load the lookup file from specified sheet
+    log(f"📖 Reading lookup file: {CONFIG['lookup_file']} (Sheet: {CONFIG['lookup_sheet_name']})")
+    df_lookup = pd.read_excel(
+        lookup_file,
+        sheet_name=CONFIG["lookup_sheet_name"],
+        usecols=[CONFIG["lookup_key_column"], CONFIG["lookup_value_column"]],
+        engine=CONFIG["excel_engine"]
+    )
+
+    # Step 5: Create a lookup Series keyed by unique IDs (last occurrence wins; blank IDs never match)
+    log("🔧 Creating lookup table...")
+    df_lookup = df_lookup.dropna(subset=[CONFIG["lookup_key_column"]])
+    df_lookup = df_lookup.drop_duplicates(subset=[CONFIG["lookup_key_column"]], keep="last")
+    log(f"🔑 {len(df_lookup)} unique keys in lookup file.")
+    lookup_series = df_lookup.set_index(CONFIG["lookup_key_column"])[CONFIG["lookup_value_column"]]
+
+    # Step 6: Fill values using the lookup table
+    log(f"🧩 Matching '{CONFIG['main_column_to_match']}' and filling '{CONFIG['main_column_to_fill']}'...")
+    keys = df_main[CONFIG["main_column_to_match"]]
+    # Unmatched means the key is absent; a found key with a blank value still counts as matched
+    unmatched_mask = ~keys.isin(lookup_series.index)
+    mapped = keys.map(lookup_series).mask(unmatched_mask, CONFIG["unmatched_placeholder"])
+    # Assigned in one go; the column is created here if the main file doesn't have it
+    df_main[CONFIG["main_column_to_fill"]] = mapped.to_numpy()
+    matched_rows = int((~unmatched_mask).sum())
+    unmatched_rows = int(unmatched_mask.sum())
+
+    log(f"✅ Filled {matched_rows} rows from lookup.")
+    log(f"⚠️ {unmatched_rows} unmatched rows set to '{CONFIG['unmatched_placeholder']}'")
+
+    # Step 7: Save unmatched rows to a separate Excel file
     if unmatched_rows:
-        df_unmatched = df_main.loc[unmatched_rows]
+        df_unmatched = df_main[unmatched_mask]
         df_unmatched.to_excel(CONFIG["unmatched_output_file"], index=False)
-        print(f"📝 Unmatched rows written to: {CONFIG['unmatched_output_file']}")
+        log(f"📝 Unmatched rows written to: {CONFIG['unmatched_output_file']}")
     else:
-        print("✅ All rows matched. No unmatched rows found.")
+        log("✅ All rows matched. No unmatched rows found.")
 
-    # Step 9: Save the updated main file
+    # Step 8: Save the updated main file
     df_main.to_excel(CONFIG["output_file"], index=False)
-    print(f"💾 Final output saved to: {CONFIG['output_file']}")
+    log(f"💾 Final output saved to: {CONFIG['output_file']}")
 
-    # Step 10: Print execution time
-    duration = datetime.now() - start_time
-    print(f"🕒 Execution time: {format_duration(duration)}")
-    print("🎉 Script completed successfully!\n")
+    # Step 9: Print execution time
+    log(f"🕒 Execution time: {format_duration(time.perf_counter() - start_time)}")
+    log("🎉 Script completed successfully!\n")
+    sys.stdout.flush()
 
 # Run the main function
 if __name__ == "__main__":
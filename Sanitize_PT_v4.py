@@ -1,7 +1,19 @@
 import pandas as pd
+import numpy as np
+import hashlib
 import os
+import re
+import sys
+import tempfile
+import time
 import warnings
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from functools import lru_cache, reduce
+from pathlib import Path
+
+# Characters that make a search string a regular expression rather than plain text
+REGEX_METACHARS = set(".^$*+?{}[]\\|()")
 
 # ✅ Suppress Excel warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -10,9 +22,16 @@ warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 CONFIG = {
     "main_file": "main.xlsx",
     "output_file": "updated_main.xlsx",
+    "data_sheet_name": "Data",
     "summary_sheet_name": "Summary",
-    "unmatched_output_file": "unmatched_rows.xlsx",
+    "output_format": "xlsx",     # "xlsx" (data + summary sheets), "csv" or "parquet"
+    "unmatched_output_file": "unmatched_rows.xlsx",  # extension follows output_format
     "unmatched_placeholder": "ID not found",
+    "excel_engine": "calamine",  # needs python-calamine; set to "openpyxl" if not installed
+    "main_usecols": None,        # columns to read from main file (None = all)
+    "use_parquet_cache": True,   # reuse a .parquet (or .pkl) sidecar when the workbook is unchanged
+    "verbose": True,             # print progress messages
+    "category_columns": ["Severity", "Policy Status"],  # low-cardinality columns used in rules
 
     # Static columns to prepend
     "new_columns": ["Scan Date", "Reviewer"],
@@ -20,6 +39,7 @@ CONFIG = {
         "Scan Date": "2025-05-24",
         "Reviewer": "Security Team"
     },
+    "static_date_columns": ["Scan Date"],
 
     # Lookup from external files
     "lookups": [
@@ -71,132 +91,282 @@ CONFIG = {
     }
 }
 
+# Progress output; silenced when CONFIG["verbose"] is False
+def log(message):
+    if CONFIG["verbose"]:
+        sys.stdout.write(f"{message}\n")
+
 # Format execution time
-def format_duration(duration):
-    seconds = duration.total_seconds()
-    if seconds < 60:
-        return f"{seconds:.2f} seconds"
-    elif seconds < 3600:
-        return f"{seconds // 60:.0f} minutes {seconds % 60:.0f} seconds"
-    else:
-        h = int(seconds // 3600)
-        m = int((seconds % 3600) // 60)
-        s = int(seconds % 60)
+def format_duration(seconds):
+    h, rem = divmod(int(seconds), 3600)
+    m, s = divmod(rem, 60)
+    if h:
         return f"{h}h {m}m {s}s"
+    if m:
+        return f"{m}m {s}s"
+    return f"{seconds:.2f}s"
+
+# Join keys as Arrow strings, so an ID stored as 101, 101.0 or "101" is the same key in every file
+def key_strings(series):
+    if pd.api.types.is_float_dtype(series.dtype) and (series.dropna() % 1 == 0).all():
+        series = series.astype("Int64")  # whole-number floats (numeric IDs with blanks) lose the ".0"
+    return series.astype("string[pyarrow]")
+
+# Read one sheet with the configured engine; openpyxl is kept in streaming read-only mode
+def read_sheet(path, sheet_name=0, usecols=None):
+    engine = CONFIG["excel_engine"]
+    engine_kwargs = {"read_only": True, "data_only": True} if engine == "openpyxl" else None
+    return pd.read_excel(
+        path, sheet_name=sheet_name, usecols=usecols,
+        engine=engine, engine_kwargs=engine_kwargs
+    )
+
+# Sidecar formats, tried in order: parquet, or a pickle for frames parquet can't hold
+# (columns mixing numbers and text, e.g. App IDs 101 and "X-9"), which round-trips them exactly
+SIDECAR_READERS = {".parquet": pd.read_parquet, ".pkl": pd.read_pickle}
+
+# Write a sidecar atomically: temp file next to it, then swap it in, so readers never see a partial file
+def write_sidecar(df, cache_base):
+    tmp_path = None
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=cache_base.parent, prefix=f"{cache_base.name}.", suffix=".tmp")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            df.to_parquet(tmp_path, index=False)
+            suffix = ".parquet"
+        except (ImportError, TypeError, ValueError):
+            df.to_pickle(tmp_path)
+            suffix = ".pkl"
+        tmp_path.replace(cache_base.with_name(f"{cache_base.name}{suffix}"))
+    except OSError as e:
+        log(f"⚠️ Could not cache '{cache_base}': {e}")
+    finally:
+        if tmp_path:
+            tmp_path.unlink(missing_ok=True)
+
+# Read an Excel sheet, reusing a sidecar copy next to the workbook when it is up to date
+def read_excel_cached(path, sheet_name=0, usecols=None):
+    if not CONFIG["use_parquet_cache"]:
+        return read_sheet(path, sheet_name=sheet_name, usecols=usecols)
+
+    path = Path(path)
+    key = hashlib.md5(repr((sheet_name, usecols)).encode()).hexdigest()[:8]
+    cache_base = path.with_name(f"{path.name}.{key}")
+    for suffix, reader in SIDECAR_READERS.items():
+        cache_path = cache_base.with_name(f"{cache_base.name}{suffix}")
+        try:
+            if cache_path.stat().st_mtime >= path.stat().st_mtime:
+                log(f"⚡ Using cached copy: {cache_path}")
+                return reader(cache_path)
+        except FileNotFoundError:
+            pass  # no sidecar in this format yet
+
+    df = read_sheet(path, sheet_name=sheet_name, usecols=usecols)
+    write_sidecar(df, cache_base)
+    return df
+
+# Write a single frame as xlsx, csv or parquet
+def write_frame(df, path, output_format):
+    if output_format == "parquet":
+        df.to_parquet(path, index=False)
+    elif output_format == "csv":
+        df.to_csv(path, index=False)
+    else:
+        with pd.ExcelWriter(path, engine="xlsxwriter", datetime_format="yyyy-mm-dd") as writer:
+            df.to_excel(writer, index=False)
+
+# Load a lookup sheet once per run; lookups sharing a file, sheet and columns reuse it
+@lru_cache(maxsize=None)
+def load_lookup(path, sheet_name, usecols):
+    return read_excel_cached(path, sheet_name=sheet_name, usecols=list(usecols))
+
+def lookup_source(lookup):
+    return (
+        lookup["lookup_file"],
+        lookup["sheet_name"],
+        (lookup["lookup_key_column"], lookup["lookup_value_column"])
+    )
 
 # Main script logic
 def main():
-    start_time = datetime.now()
-    print("\n🚀 Starting Excel enhancement script...\n")
+    start_time = time.perf_counter()
+    log("\n🚀 Starting Excel enhancement script...\n")
 
     # Load main Excel file
-    if not os.path.exists(CONFIG["main_file"]):
+    if not Path(CONFIG["main_file"]).is_file():
         print(f"❌ File not found: {CONFIG['main_file']}")
         return
-    df_main = pd.read_excel(CONFIG["main_file"], engine="openpyxl")
+    df_main = read_excel_cached(CONFIG["main_file"], usecols=CONFIG["main_usecols"])
+
+    # Rule columns are compared repeatedly; as categories the comparisons run on integer codes
+    for col in CONFIG["category_columns"]:
+        if col in df_main.columns:
+            df_main[col] = df_main[col].astype("category")
 
     # Add static columns
-    print("➕ Adding static columns:")
-    df_static = pd.DataFrame()
-    for col in CONFIG["new_columns"]:
+    log("➕ Adding static columns:")
+    column_notes = []
+    for i, col in enumerate(CONFIG["new_columns"]):
         val = CONFIG["column_static_values"].get(col, "")
-        df_static[col] = [val] * len(df_main)
-        print(f"  - {col}: '{val}'")
-    df_main = pd.concat([df_static, df_main], axis=1)
+        column_notes.append(f"  - {col}: '{val}'")
+        if col in CONFIG["static_date_columns"]:
+            val = pd.Timestamp(val)  # parsed once so Excel gets a real date
+        df_main.insert(i, col, val, allow_duplicates=True)
+    log("\n".join(column_notes))
 
-    all_unmatched_indices = set()
+    all_unmatched_mask = np.zeros(len(df_main), dtype=bool)
     summary_data = []
 
-    # Apply lookups
+    # Lookup files are independent, so read them concurrently
+    available_lookups = []
     for lookup in CONFIG["lookups"]:
-        print(f"\n🔍 Lookup for: {lookup['target_column']}")
-        if lookup["target_column"] not in df_main.columns:
-            df_main[lookup["target_column"]] = ""
-
-        if not os.path.exists(lookup["lookup_file"]):
+        log(f"\n🔍 Lookup for: {lookup['target_column']}")
+        if not Path(lookup["lookup_file"]).is_file():
             print(f"❌ Missing file: {lookup['lookup_file']}")
+            if lookup["target_column"] not in df_main.columns:
+                df_main[lookup["target_column"]] = ""
             continue
+        available_lookups.append(lookup)
 
-        df_lookup = pd.read_excel(lookup["lookup_file"], sheet_name=lookup["sheet_name"], engine="openpyxl")
-        lookup_dict = pd.Series(
-            df_lookup[lookup["lookup_value_column"]].values,
-            index=df_lookup[lookup["lookup_key_column"]]
-        ).to_dict()
-
-        matched = unmatched = 0
-        for idx, value in df_main[lookup["match_column"]].items():
-            if value in lookup_dict:
-                df_main.at[idx, lookup["target_column"]] = lookup_dict[value]
-                matched += 1
-            else:
-                df_main.at[idx, lookup["target_column"]] = CONFIG["unmatched_placeholder"]
-                all_unmatched_indices.add(idx)
-                unmatched += 1
-
-        print(f"✅ Matched: {matched}, ❌ Unmatched: {unmatched}")
-        summary_data.append({
-            "Target Column": lookup["target_column"],
-            "Matched Rows": matched,
-            "Unmatched Rows": unmatched
+    raw_lookups = {}
+    sources = {lookup_source(lookup) for lookup in available_lookups}
+    if sources:
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {executor.submit(load_lookup, *source): source for source in sources}
+            for future in as_completed(futures):
+                raw_lookups[futures[future]] = future.result()
+
+    # Group lookups by the main-file column they match on
+    lookup_frames = {}
+    for lookup in available_lookups:
+        # Select + rename returns a new frame, so the cached frame from load_lookup is never modified
+        df_lookup = raw_lookups[lookup_source(lookup)][[lookup["lookup_key_column"], lookup["lookup_value_column"]]]
+        df_lookup = df_lookup.rename(columns={
+            lookup["lookup_key_column"]: lookup["match_column"],
+            lookup["lookup_value_column"]: lookup["target_column"]
         })
+        # Reference files may store the same IDs as numbers or as text; one key dtype lets them be joined
+        df_lookup[lookup["match_column"]] = key_strings(df_lookup[lookup["match_column"]])
+        # Blank IDs never match (the old dict lookup didn't either)
+        df_lookup = df_lookup.dropna(subset=[lookup["match_column"]])
+        df_lookup = df_lookup.drop_duplicates(subset=[lookup["match_column"]], keep="last")
+        lookup_frames.setdefault(lookup["match_column"], []).append((lookup["target_column"], df_lookup))
+
+    # Apply lookups: one join per match column fills every target column at once
+    for match_column, frames in lookup_frames.items():
+        combined = reduce(
+            lambda left, right: left.merge(right, on=match_column, how="outer"),
+            [df_lookup for _, df_lookup in frames]
+        )
+
+        # Join on a shared categorical key so the merge hashes integer codes, not Python objects.
+        # Only the temporary key frames are cast; df_main keeps its original dtype for output.
+        main_keys = key_strings(df_main[match_column])
+        left_keys = pd.DataFrame({match_column: main_keys})
+        key_dtype = pd.CategoricalDtype(
+            pd.concat([left_keys[match_column], combined[match_column]]).dropna().unique()
+        )
+        left_keys = left_keys.astype({match_column: key_dtype})
+        combined = combined.astype({match_column: key_dtype})
+
+        # Left join keeps row order of df_main; m:1 guards against fan-out from the reference files
+        merged = left_keys.merge(combined, on=match_column, how="left", validate="m:1")
+
+        for target_column, df_lookup in frames:
+            # Unmatched means the ID is absent from this reference file; a found ID with a blank value is matched
+            unmatched_mask = ~main_keys.isin(df_lookup[match_column]).to_numpy(dtype=bool, na_value=False)
+            mapped = pd.Series(merged[target_column].to_numpy(), index=df_main.index)
+            df_main[target_column] = mapped.mask(unmatched_mask, CONFIG["unmatched_placeholder"]).to_numpy()
+            all_unmatched_mask |= unmatched_mask
+            matched = int((~unmatched_mask).sum())
+            unmatched = int(unmatched_mask.sum())
+
+            log(f"✅ {target_column} - Matched: {matched}, ❌ Unmatched: {unmatched}")
+            summary_data.append({
+                "Target Column": target_column,
+                "Matched Rows": matched,
+                "Unmatched Rows": unmatched
+            })
 
     # String fill rule
     if "string_fill_rule" in CONFIG:
         rule = CONFIG["string_fill_rule"]
-        print(f"\n🔎 Filling '{rule['target_column']}' if '{rule['search_string']}' in '{rule['search_column']}'")
+        log(f"\n🔎 Filling '{rule['target_column']}' if '{rule['search_string']}' in '{rule['search_column']}'")
         if rule["target_column"] not in df_main.columns:
             df_main[rule["target_column"]] = ""
-        matched_rows = df_main[rule["search_column"]].astype(str).str.contains(rule["search_string"], case=False, na=False)
+        search_text = df_main[rule["search_column"]].astype(str)
+        if REGEX_METACHARS.isdisjoint(rule["search_string"]):
+            # Plain keyword: literal case-insensitive search, no regex engine involved
+            matched_rows = search_text.str.contains(rule["search_string"], case=False, na=False, regex=False)
+        else:
+            pattern = re.compile(rule["search_string"], re.IGNORECASE)
+            matched_rows = search_text.str.contains(pattern, na=False)
         df_main.loc[matched_rows, rule["target_column"]] = rule["fill_value"]
-        print(f"✅ Filled {matched_rows.sum()} rows")
+        log(f"✅ Filled {matched_rows.sum()} rows")
 
     # Date difference rule
     if "date_diff_rule" in CONFIG:
         rule = CONFIG["date_diff_rule"]
-        print(f"\n📅 Calculating days since '{rule['date_column']}' → '{rule['target_column']}'")
+        log(f"\n📅 Calculating days since '{rule['date_column']}' → '{rule['target_column']}'")
         if rule["target_column"] not in df_main.columns:
             df_main[rule["target_column"]] = ""
-        today = date.today()
-        df_main[rule["target_column"]] = pd.to_datetime(df_main[rule["date_column"]], errors="coerce").apply(
-            lambda d: (today - d.date()).days if pd.notnull(d) else ""
-        )
-        print("✅ Date difference calculated")
+        # Plain datetime64 so the day arithmetic below behaves the same for Arrow-backed input
+        reviewed = pd.to_datetime(df_main[rule["date_column"]], errors="coerce").astype("datetime64[ns]")
+        # Whole-day difference against today's midnight; missing dates stay blank (nullable Int64)
+        days = (pd.Timestamp(date.today()) - reviewed.dt.normalize()).dt.days
+        df_main[rule["target_column"]] = days.astype("Int64")
+        log("✅ Date difference calculated")
 
     # Severity + Count rule
     if "severity_count_rule" in CONFIG:
         rule = CONFIG["severity_count_rule"]
-        print(f"\n📊 Applying severity-count logic → '{rule['target_column']}'")
-        if rule["target_column"] not in df_main.columns:
-            df_main[rule["target_column"]] = ""
-
+        log(f"\n📊 Applying severity-count logic → '{rule['target_column']}'")
+        severities = df_main[rule["severity_column"]]
+        counts = df_main[rule["count_column"]]
+        conditions, choices = [], []
         for severity, threshold in rule["rules"].items():
-            condition = (
-                (df_main[rule["severity_column"]] == severity) &
-                (df_main[rule["count_column"]] > threshold)
-            )
-            df_main.loc[condition, rule["target_column"]] = rule["value_if_true"]
-            df_main.loc[(df_main[rule["severity_column"]] == severity) & ~condition, rule["target_column"]] = rule["value_if_false"]
-        print("✅ Status filled based on Severity and Count")
-
-    # Save unmatched rows
-    if all_unmatched_indices:
-        df_main.loc[list(all_unmatched_indices)].to_excel(CONFIG["unmatched_output_file"], index=False)
-        print(f"\n⚠️ Saved unmatched rows to: {CONFIG['unmatched_output_file']}")
-    else:
-        print("\n✅ All lookups matched")
+            is_severity = (severities == severity).to_numpy(dtype=bool, na_value=False)
+            over = is_severity & (counts > threshold).to_numpy(dtype=bool, na_value=False)
+            conditions += [over, is_severity & ~over]
+            choices += [rule["value_if_true"], rule["value_if_false"]]
+
+        # Rows with an unlisted severity keep their existing value (blank if the column is new)
+        current = df_main[rule["target_column"]].to_numpy() if rule["target_column"] in df_main.columns else ""
+        df_main[rule["target_column"]] = np.select(conditions, choices, default=current)
+        log("✅ Status filled based on Severity and Count")
 
-    # Save final Excel
-    df_main.to_excel(CONFIG["output_file"], index=False)
-    print(f"💾 Final file saved: {CONFIG['output_file']}")
+    # Save unmatched rows in the same format as the main output
+    output_format = CONFIG["output_format"]
+    if all_unmatched_mask.any():
+        unmatched_path = Path(CONFIG["unmatched_output_file"]).with_suffix(f".{output_format}")
+        write_frame(df_main.loc[all_unmatched_mask], unmatched_path, output_format)
+        log(f"\n⚠️ Saved unmatched rows to: {unmatched_path}")
+    else:
+        log("\n✅ All lookups matched")
 
-    # Save summary sheet
-    with pd.ExcelWriter(CONFIG["output_file"], engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name=CONFIG["summary_sheet_name"], index=False)
-        print(f"📊 Summary added: {CONFIG['summary_sheet_name']}")
+    # Save final Excel and summary sheet in one writer session.
+    # No xlsxwriter constant_memory: pandas writes cells column by column, which that mode drops.
+    summary_df = pd.DataFrame(summary_data)
+    if output_format == "xlsx":
+        with pd.ExcelWriter(CONFIG["output_file"], engine="xlsxwriter", datetime_format="yyyy-mm-dd") as writer:
+            df_main.to_excel(writer, sheet_name=CONFIG["data_sheet_name"], index=False)
+            summary_df.to_excel(writer, sheet_name=CONFIG["summary_sheet_name"], index=False)
+        log(f"💾 Final file saved: {CONFIG['output_file']}")
+        log(f"📊 Summary added: {CONFIG['summary_sheet_name']}")
+    else:
+        # Data-only formats can't hold a second sheet, so the summary goes to its own file
+        output_path = Path(CONFIG["output_file"]).with_suffix(f".{output_format}")
+        summary_path = output_path.with_name(f"{output_path.stem}_{CONFIG['summary_sheet_name']}.{output_format}")
+        write_frame(df_main, output_path, output_format)
+        write_frame(summary_df, summary_path, output_format)
+        log(f"💾 Final file saved: {output_path}")
+        log(f"📊 Summary saved: {summary_path}")
 
     # Final execution log
-    print(f"\n🕒 Execution time: {format_duration(datetime.now() - start_time)}")
-    print("🎉 Script finished successfully!\n")
+    log(f"\n🕒 Execution time: {format_duration(time.perf_counter() - start_time)}")
+    log("🎉 Script finished successfully!\n")
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
@@ -1,23 +1,57 @@
-import win32com.client as win32
-
-# Launch Outlook application
-outlook = win32.Dispatch('Outlook.Application')
-
-# Create a new mail item (0 = Mail Item)
-mail = outlook.CreateItem(0)
-
-# Set email details
-mail.To = 'recipient@example.com'
-mail.Subject = 'Test Email from Python'
-mail.Body = 'Hello,\n\nThis is an automated email sent from Python using Outlook.\n\nRegards,\nYour Name'
-
-# Send the email
-mail.Send()
-
-print("Email sent successfully.")
-
-
-
-
-
-python -c "import win32com.client; print('pywin32 available')"
+import os
+import smtplib
+import ssl
+from email.message import EmailMessage
+
+# === CONFIGURATION ===
+CONFIG = {
+    "to": "recipient@example.com",
+    "subject": "Test Email from Python",
+    "body": "Hello,\n\nThis is an automated email sent from Python.\n\nRegards,\nYour Name",
+
+    # SMTP settings (read from the environment); leave SMTP_HOST unset to send through Outlook instead
+    "smtp_host": os.environ.get("SMTP_HOST", ""),
+    "smtp_port": int(os.environ.get("SMTP_PORT", "465")),
+    "smtp_user": os.environ.get("SMTP_USER", ""),
+    "smtp_password": os.environ.get("SMTP_PASSWORD", ""),
+    "from": os.environ.get("SMTP_FROM", os.environ.get("SMTP_USER", ""))
+}
+
+def build_message(to, subject, body):
+    msg = EmailMessage()
+    msg["From"] = CONFIG["from"]
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg
+
+# Send all messages over one SSL connection (no per-message reconnect)
+def send_smtp(messages):
+    context = ssl.create_default_context()
+    with smtplib.SMTP_SSL(CONFIG["smtp_host"], CONFIG["smtp_port"], context=context) as server:
+        if CONFIG["smtp_user"]:
+            server.login(CONFIG["smtp_user"], CONFIG["smtp_password"])
+        for msg in messages:
+            server.send_message(msg)
+
+# Fallback for Windows desktops without SMTP access (requires pywin32)
+def send_outlook(to, subject, body):
+    import win32com.client as win32
+
+    # Launch Outlook application and create a new mail item (0 = Mail Item)
+    outlook = win32.Dispatch('Outlook.Application')
+    mail = outlook.CreateItem(0)
+    mail.To = to
+    mail.Subject = subject
+    mail.Body = body
+    mail.Send()
+
+def main():
+    if CONFIG["smtp_host"]:
+        send_smtp([build_message(CONFIG["to"], CONFIG["subject"], CONFIG["body"])])
+    else:
+        send_outlook(CONFIG["to"], CONFIG["subject"], CONFIG["body"])
+    print("Email sent successfully.")
+
+if __name__ == "__main__":
+    main()
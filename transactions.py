@@ -1,5 +1,9 @@
 import pandas as pd
+import numpy as np
 import os
+import hashlib
+import multiprocessing as mp
+import tempfile
 import time
 from datetime import datetime
 
@@ -8,11 +12,21 @@ CONFIG = {
     "input_file": "input_data.xlsx",
     "input_sheet": "Sheet1",
     "output_file": "processed_output.xlsx",
+    "excel_engine": "calamine",  # needs python-calamine; "openpyxl" is the read-only fallback
+    "output_format": "xlsx",  # "xlsx", "csv" or "parquet" (extension of output_file is adjusted)
 
     "columns_to_extract": [
         "App ID", "Application Name", "Scan Date", "Status", "Severity", "Lifecycle", "Flag"
     ],
 
+    # Known text columns are read as Arrow strings; everything else keeps its inferred type
+    "dtypes": {
+        "Application Name": "string[pyarrow]",
+        "Status": "string[pyarrow]"
+    },
+    # Low-cardinality input columns, cast to category after loading so blank cells stay missing
+    "category_input_columns": ["Severity"],
+
     "columns_to_add": {
         "Reviewed By": "Security Team",
         "Lifecycle": "",
@@ -50,88 +64,223 @@ CONFIG = {
         }
     },
 
-    "drop_empty_rows": True
+    "category_output_columns": ["Lifecycle", "Reviewed By"],  # few distinct values, many rows
+
+    "drop_empty_rows": True,
+    "stream_read_min_bytes": 50 * 1024 * 1024,  # stream-parse inputs at least this large
+    "cache_dir": ".cache",  # parquet/pickle copies of parsed inputs, reused while the file is unchanged (None = off)
+    "verbose": True  # print step headers and progress messages
 }
 
 # === MAIN FUNCTION ===
-def print_header(title):
-    print(f"\n{'=' * 60}\n🔷 {title}\n{'=' * 60}")
+def print_header(title, log=print):
+    log(f"\n{'=' * 60}\n🔷 {title}\n{'=' * 60}")
+
+# Row-streaming reader for very large sheets: keeps only the wanted columns of each row
+# instead of materializing the whole sheet first
+def stream_read(path, sheet, cols):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        header = next(rows, ())
+        idx = [header.index(col) for col in cols if col in header]
+        data = [[row[i] if i < len(row) else None for i in idx] for row in rows]
+    finally:
+        wb.close()
+    return pd.DataFrame(data, columns=[header[i] for i in idx])
+
+# Parse the input sheet, projecting to the configured columns
+def read_input(config, log=print):
+    wanted = set(config["columns_to_extract"])
+    engine = config.get("excel_engine", "calamine")
+    engine_kwargs = {"read_only": True, "data_only": True, "keep_links": False} if engine == "openpyxl" else None
+    dtypes = {col: dtype for col, dtype in config.get("dtypes", {}).items() if col in wanted}
+    if os.path.getsize(config["input_file"]) >= config.get("stream_read_min_bytes", float("inf")):
+        log("🌊 Large input, streaming rows...")
+        df = stream_read(config["input_file"], config["input_sheet"], config["columns_to_extract"])
+        return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+    return pd.read_excel(
+        config["input_file"],
+        sheet_name=config["input_sheet"],
+        usecols=lambda col: col in wanted,
+        engine=engine,
+        engine_kwargs=engine_kwargs,
+        dtype=dtypes
+    )
+
+# Same as read_input, but reuses a cached copy keyed by file, mtime, sheet, columns and dtypes.
+# Parquet when the frame fits Arrow types; otherwise (e.g. App IDs mixing 101 and "A-2") a pickle,
+# which keeps mixed object columns exactly as read
+def cached_read_input(config, log=print):
+    cache_dir = config.get("cache_dir")
+    if not cache_dir:
+        return read_input(config, log)
+
+    path = config["input_file"]
+    key_source = "|".join(map(str, [
+        os.path.abspath(path), os.path.getmtime(path), config["input_sheet"],
+        config["columns_to_extract"], config.get("dtypes")
+    ]))
+    cache_base = os.path.join(cache_dir, hashlib.md5(key_source.encode()).hexdigest())
+    for suffix, reader in [(".parquet", pd.read_parquet), (".pkl", pd.read_pickle)]:
+        if os.path.exists(cache_base + suffix):
+            log(f"⚡ Using cached copy: {cache_base + suffix}")
+            return reader(cache_base + suffix)
+
+    df = read_input(config, log)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a private temp file and swap it in, so parallel runs never read a half-written cache
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, index=False)
+            suffix = ".parquet"
+        except (ImportError, TypeError, ValueError):
+            df.to_pickle(tmp_path)
+            suffix = ".pkl"
+        os.replace(tmp_path, cache_base + suffix)
+    except OSError as e:
+        log(f"⚠️ Could not cache '{path}': {e}")
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
 
 def process_excel(config):
-    start_time = time.time()
+    start_time = time.perf_counter()
+    log = print if config.get("verbose", True) else (lambda *args, **kwargs: None)
 
     # STEP 1: Load input Excel
-    print_header("STEP 1: LOAD FILE")
+    print_header("STEP 1: LOAD FILE", log)
     if not os.path.exists(config["input_file"]):
         print(f"❌ File not found: {config['input_file']}")
         return
-    df = pd.read_excel(config["input_file"], sheet_name=config["input_sheet"])
-    print(f"✅ Loaded {df.shape[0]} rows.")
+    df = cached_read_input(config, log)
+    for col in config.get("category_input_columns", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    log(f"✅ Loaded {df.shape[0]} rows.")
 
     # STEP 2: Keep required columns
-    print_header("STEP 2: FILTER COLUMNS")
-    df = df[[col for col in config["columns_to_extract"] if col in df.columns]]
+    print_header("STEP 2: FILTER COLUMNS", log)
+    present = set(df.columns)
+    # Columns computed in Steps 5/6 (Lifecycle, Flag) aren't expected in the input
+    computed = {config["lifecycle_rules"]["target_column"], config["final_mapping"]["target_column"]}
+    missing = [col for col in config["columns_to_extract"] if col not in present and col not in computed]
+    if missing:
+        log(f"⚠️ Columns not found in input: {missing}")
+    # usecols already dropped unwanted columns at read time; only reorder if needed
+    ordered = [col for col in config["columns_to_extract"] if col in present]
+    if list(df.columns) != ordered:
+        df = df[ordered]
     if config.get("drop_empty_rows"):
-        before = df.shape[0]
-        df = df.dropna(how="all")
-        print(f"🧹 Dropped {before - df.shape[0]} empty rows.")
+        keep = df.notna().to_numpy().any(axis=1)
+        if not keep.all():
+            df = df.iloc[keep]  # only copy the frame when there is something to drop
+        log(f"🧹 Dropped {int((~keep).sum())} empty rows.")
 
     # STEP 3: Add static/blank columns
-    print_header("STEP 3: ADD COLUMNS")
-    for col, val in config["columns_to_add"].items():
-        df[col] = val
-        print(f"➕ Added column: {col}")
+    print_header("STEP 3: ADD COLUMNS", log)
+    # Computed columns would be overwritten in Steps 5/6, so they aren't pre-filled
+    to_add = {col: val for col, val in config["columns_to_add"].items() if col not in computed}
+    df = df.assign(**to_add)
+    log(f"➕ Added columns: {list(to_add)}")
 
     # STEP 4: Calculate age (internally)
-    print_header("STEP 4: CALCULATE AGE")
+    print_header("STEP 4: CALCULATE AGE", log)
     age_cfg = config["inplace_age_check"]
-    today = datetime.today().date()
-    df[age_cfg["date_column"]] = pd.to_datetime(df[age_cfg["date_column"]], errors='coerce').dt.date
-    df[age_cfg["age_variable"]] = df[age_cfg["date_column"]].apply(
-        lambda d: (today - d).days if pd.notnull(d) else -1
-    )
-    print("🧮 Age calculated internally.")
+    today = pd.Timestamp(datetime.today().date())
+    # Stay in datetime64 (midnight-normalized) rather than Python date objects
+    dates = pd.to_datetime(df[age_cfg["date_column"]], errors='coerce').astype("datetime64[ns]").dt.normalize()
+    # int16 holds ~89 years of days; clip so out-of-range dates saturate instead of wrapping
+    age_days = (today - dates).dt.days.fillna(-1).clip(np.iinfo(np.int16).min, np.iinfo(np.int16).max)
+    df[age_cfg["age_variable"]] = age_days.astype("int16")
+    df[age_cfg["date_column"]] = dates
+    log("🧮 Age calculated internally.")
 
     # STEP 5: Lifecycle classification
-    print_header("STEP 5: APPLY LIFECYCLE LOGIC")
+    print_header("STEP 5: APPLY LIFECYCLE LOGIC", log)
     rules = config["lifecycle_rules"]
     tgt = rules["target_column"]
     eol = rules["eol_rule"]
     slo = rules["slo_rules"]
 
-    def classify(row):
-        if eol["keyword"].lower() in str(row.get(eol["trigger_column"], "")).lower():
-            return eol["value"]
-        severity = str(row.get("Severity", "")).strip().lower()
-        age = row.get(age_cfg["age_variable"])
-        try:
-            age = int(age)
-        except:
-            return ""
-        for rule in slo:
-            if rule["severity"].lower() == severity:
-                return rule["true_value"] if age > rule["age_gt"] else rule["false_value"]
-        return ""
+    # Rule table as parallel arrays (one entry per SLO rule), built once
+    rule_severities = list(dict.fromkeys(rule["severity"].lower() for rule in slo))
+    rule_codes = np.array([rule_severities.index(rule["severity"].lower()) for rule in slo], dtype=np.int64)
+    rule_thresholds = np.array([rule["age_gt"] for rule in slo], dtype=np.float64)
+    rule_true = [rule["true_value"] for rule in slo]
+    rule_false = [rule["false_value"] for rule in slo]
 
-    df[tgt] = df.apply(classify, axis=1)
-    print(f"✅ '{tgt}' filled using severity + age logic.")
+    # Vectorized equivalent of the old per-row classifier: conditions are checked in
+    # order (EOL first, then each SLO rule's true/false branch), first match wins
+    blank = pd.Series("", index=df.index)
+    trigger = df.get(eol["trigger_column"], blank).astype(str)
+    # Normalize Severity once, then compare small integer codes against the rule severities
+    severity_codes = pd.Categorical(
+        df.get("Severity", blank).astype("string").str.strip().str.lower(),
+        categories=rule_severities
+    ).codes
+    # Missing dates already carry the -1 sentinel, so every row has an age
+    age = df[age_cfg["age_variable"]].to_numpy()
+
+    # (rules x rows) masks via broadcasting
+    is_severity = severity_codes[None, :] == rule_codes[:, None]
+    over_age = age[None, :] > rule_thresholds[:, None]
+    rule_conditions = np.empty((2 * len(slo), len(df)), dtype=bool)
+    rule_conditions[0::2] = is_severity & over_age
+    rule_conditions[1::2] = is_severity & ~over_age
+    rule_choices = [value for pair in zip(rule_true, rule_false) for value in pair]
+
+    eol_mask = trigger.str.contains(eol["keyword"], case=False, regex=False, na=False).to_numpy(dtype=bool)
+    df[tgt] = np.select([eol_mask, *rule_conditions], [eol["value"], *rule_choices], default="")
+    log(f"✅ '{tgt}' filled using severity + age logic.")
 
     # STEP 6: Final mapping into separate target column
-    print_header("STEP 6: FINAL MAPPING TO TARGET COLUMN")
+    print_header("STEP 6: FINAL MAPPING TO TARGET COLUMN", log)
     fmap = config["final_mapping"]
     src = fmap["source_column"]
     dst = fmap["target_column"]
-    df[dst] = df[src].map(fmap["map_values"]).fillna("")
-    print(f"🔁 Final values written to '{dst}' from '{src}'")
+    # Known labels become their position in map_values; unknown ones get -1, which picks the trailing ""
+    codes = pd.Index(list(fmap["map_values"])).get_indexer(df[src])
+    lut = np.array(list(fmap["map_values"].values()) + [""], dtype=object)
+    df[dst] = lut[codes]
+    log(f"🔁 Final values written to '{dst}' from '{src}'")
 
     # STEP 7: Save
-    print_header("STEP 7: SAVE TO FILE")
-    df.drop(columns=[age_cfg["age_variable"]], errors='ignore').to_excel(config["output_file"], index=False)
-    print(f"✅ Output saved: {config['output_file']}")
+    print_header("STEP 7: SAVE TO FILE", log)
+    df = df.drop(columns=[age_cfg["age_variable"]], errors='ignore')
+    for col in config.get("category_output_columns", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    output_format = config.get("output_format", "xlsx")
+    output_file = os.path.splitext(config["output_file"])[0] + f".{output_format}"
+    if output_format == "parquet":
+        # A parquet column holds one type, and the mapped Flag mixes "EOL" with 0/1, so store it as text
+        df.astype({dst: "string"}).to_parquet(output_file, index=False)
+    elif output_format == "csv":
+        df.to_csv(output_file, index=False, lineterminator="\n")
+    else:
+        with pd.ExcelWriter(output_file, engine="xlsxwriter", datetime_format="yyyy-mm-dd") as writer:
+            df.to_excel(writer, index=False)
+    log(f"✅ Output saved: {output_file}")
 
-    print_header("✅ DONE")
-    print(f"⏱️ Completed in {time.time() - start_time:.2f} seconds")
+    print_header("✅ DONE", log)
+    log(f"⏱️ Completed in {time.perf_counter() - start_time:.2f} seconds")
+
+# Each config is an independent input file; run them in parallel worker processes.
+# "spawn" keeps behaviour the same on Windows, where fork is unavailable.
+def main(configs):
+    if len(configs) == 1:
+        process_excel(configs[0])
+        return
+    with mp.get_context("spawn").Pool(min(len(configs), os.cpu_count() or 1)) as pool:
+        pool.map(process_excel, configs)
 
 # === RUN ===
 if __name__ == "__main__":
-    process_excel(CONFIG)
+    main([CONFIG])